@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+# this script discovers every setting that lives underneath a parent path on
+# the com.victronenergy.settings service and removes them all with a single
+# RemoveSettings call. edit PARENT_PATH below to the subtree you want gone.
+
+import re
+import sys
+import functools
+import threading
+import dbus
+from concurrent.futures import ThreadPoolExecutor
+
+BUS_NAME = 'com.victronenergy.settings'
+# Note the capital S: this is the interface name, distinct from the bus name
+SETTINGS_INTERFACE = 'com.victronenergy.Settings'
+SETTINGS_OBJECT_PATH = '/Settings'
+PARENT_PATH = '/Settings/MyCustomApp'
+# Deepest level below PARENT_PATH that can hold settings, or None to walk the
+# whole subtree. Setting this (e.g. 3 for /Settings/RemoteGPIO) skips the
+# Introspect round-trips for nodes that can only be intermediate branches.
+MAX_DEPTH = None
+
+# One shared bus connection for the main thread
+_BUS = dbus.SystemBus()
+
+@functools.lru_cache(maxsize=None)
+def _object_proxy(object_path):
+    """
+    Returns a cached proxy for an object on the settings service.
+    introspect=False skips the eager Introspect round-trip dbus-python
+    would otherwise issue for every proxy.
+    """
+    return _BUS.get_object(BUS_NAME, object_path, introspect=False)
+
+# Workers used to fan out the introspection walk. dbus-python's shared bus is
+# not safe for concurrent calls, so each worker gets its own private connection.
+_INTROSPECT_WORKERS = 8
+_thread_local = threading.local()
+
+def _thread_bus():
+    """Returns a private system bus connection cached per worker thread."""
+    bus = getattr(_thread_local, 'bus', None)
+    if bus is None:
+        bus = dbus.SystemBus(private=True)
+        _thread_local.bus = bus
+    return bus
+
+def _get_dbus_interface():
+    """
+    Returns the com.victronenergy.Settings interface on the /Settings object.
+    """
+    return dbus.Interface(_object_proxy(SETTINGS_OBJECT_PATH), SETTINGS_INTERFACE)
+
+# Child <node name=...> entries in introspection XML; the unnamed root <node>
+# element never matches because it carries no name attribute.
+_CHILD_NODE_RE = re.compile(r'<node name="([^"]+)"')
+
+def _parse_introspection(xml_string):
+    """
+    Scans one node's introspection XML without building a parse tree.
+
+    Returns:
+        tuple: (child_names, has_getvalue) where child_names is a list of
+               <node name=...> entries and has_getvalue is True when the
+               com.victronenergy.BusItem interface offers a GetValue method.
+    """
+    # Plain substring checks are enough here: the settings service only ever
+    # declares GetValue on its BusItem interface, so no structural parse is
+    # needed to pair the two.
+    has_getvalue = 'com.victronenergy.BusItem' in xml_string and '"GetValue"' in xml_string
+    return _CHILD_NODE_RE.findall(xml_string), has_getvalue
+
+def _introspect_node(parent_path):
+    """Introspects one node on the worker thread's private bus connection."""
+    node_obj = _thread_bus().get_object(BUS_NAME, parent_path, introspect=False)
+    xml_string = node_obj.Introspect(dbus_interface='org.freedesktop.DBus.Introspectable')
+    return _parse_introspection(xml_string)
+
+def _get_all_children_paths(parent_path, max_depth=None):
+    """
+    Introspects the settings service and returns a list of all object paths
+    strictly below parent_path that look like settings, i.e. expose the
+    com.victronenergy.BusItem interface with a GetValue method. The parent
+    node itself is never recorded, since it is not a removable setting.
+
+    The walk is breadth-first: each level's Introspect calls run in parallel
+    on a bounded thread pool, so the wall time is bounded by tree depth
+    rather than node count.
+
+    Args:
+        parent_path (str): The D-Bus object path to start the search from.
+        max_depth (int): Deepest level below parent_path to descend to, or
+                         None for no limit.
+
+    Returns:
+        list: A list of D-Bus object paths relative to /Settings, which is
+              the form RemoveSettings expects.
+    """
+    # Paths are recorded relative to /Settings straight away (a single slice
+    # per match) rather than built absolute and prefix-stripped afterwards.
+    rel_start = len(SETTINGS_OBJECT_PATH)
+    all_paths = []
+    with ThreadPoolExecutor(max_workers=_INTROSPECT_WORKERS) as executor:
+        frontier = [parent_path]
+        depth = 0
+        while frontier:
+            next_frontier = []
+            for path, (child_names, has_getvalue) in zip(frontier, executor.map(_introspect_node, frontier)):
+                if has_getvalue and path != parent_path:
+                    all_paths.append(path[rel_start:])
+                next_frontier.extend(f"{path}/{name}" for name in child_names)
+            depth += 1
+            if max_depth is not None and depth > max_depth:
+                break
+            frontier = next_frontier
+    return all_paths
+
+def remove_victron_settings(settings_to_remove):
+    """
+    Removes the given settings paths in one batched RemoveSettings call.
+
+    Args:
+        settings_to_remove (list): Paths relative to /Settings.
+    """
+    if not settings_to_remove:
+        print("No settings paths found to remove. Exiting.")
+        return
+
+    # Build the typed array once up front so a retry of the call does not
+    # re-walk the whole path list.
+    paths_array = dbus.Array(settings_to_remove, signature='s', variant_level=0)
+
+    try:
+        settings_iface = _get_dbus_interface()
+        result = settings_iface.RemoveSettings(paths_array)
+        print("RemoveSettings call executed successfully.")
+        if result:
+            print(f"Result: {result}")
+    except dbus.exceptions.DBusException as e:
+        print(f"D-Bus error while removing settings: {e}", file=sys.stderr)
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}", file=sys.stderr)
+
+if __name__ == "__main__":
+    print(f"Searching for settings under {PARENT_PATH}...")
+    try:
+        all_paths = _get_all_children_paths(PARENT_PATH, max_depth=MAX_DEPTH)
+    except dbus.exceptions.DBusException as e:
+        print(f"D-Bus error while discovering settings: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if not all_paths:
+        print(f"No settings found under {PARENT_PATH}. Nothing to do.")
+        sys.exit(0)
+
+    settings_to_remove = all_paths
+
+    # One write to stdout instead of one flush per path
+    print("The following settings will be removed:\n"
+          + "\n".join(f"  - {path}" for path in settings_to_remove))
+
+    answer = input("Proceed? (y/N): ").strip().lower()
+    if answer != 'y':
+        print("Aborted. No settings were removed.")
+        sys.exit(0)
+
+    remove_victron_settings(settings_to_remove)
@@ -1,7 +1,24 @@
 #!/usr/bin/env python3
-import subprocess
 import sys
 import os
+import functools
+import dbus
+
+BUS_NAME = 'com.victronenergy.settings'
+# Note the capital S: this is the interface name, distinct from the bus name
+SETTINGS_INTERFACE = 'com.victronenergy.Settings'
+
+# One shared bus connection for the whole script
+_BUS = dbus.SystemBus()
+
+@functools.lru_cache(maxsize=None)
+def _object_proxy(object_path):
+    """
+    Returns a cached proxy for an object on the settings service.
+    introspect=False skips the eager Introspect round-trip dbus-python
+    would otherwise issue for every proxy.
+    """
+    return _BUS.get_object(BUS_NAME, object_path, introspect=False)
 
 def read_settings_from_config(filename):
     """
@@ -14,15 +31,12 @@ def read_settings_from_config(filename):
         list: A list of strings, where each string is a D-Bus setting path.
               Returns an empty list if the file is not found or is empty.
     """
-    settings_paths = []
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                # Strip leading/trailing whitespace and ignore empty lines or comments
-                path = line.strip()
-                if path and not path.startswith('#'):
-                    settings_paths.append(path)
-        return settings_paths
+        with open(filename, 'r', buffering=1 << 16) as f:
+            lines = f.read().splitlines()
+        # Strip leading/trailing whitespace and ignore empty lines or comments
+        return [path for path in (line.strip() for line in lines)
+                if path and not path.startswith('#')]
     except FileNotFoundError:
         print(f"Error: Configuration file '{filename}' not found.", file=sys.stderr)
         return []
@@ -32,7 +46,8 @@ def read_settings_from_config(filename):
 
 def remove_dbus_settings(settings_paths):
     """
-    Removes a list of D-Bus settings using the dbus command line tool.
+    Removes a list of D-Bus settings with a direct call to the
+    com.victronenergy.settings service.
 
     Args:
         settings_paths (list): A list of strings, where each string is the
@@ -47,43 +62,20 @@ def remove_dbus_settings(settings_paths):
         print("Error: Input must be a list of strings.", file=sys.stderr)
         return
 
-    # Correctly format the list of paths for the D-Bus command.
-    # The required format is "%["/path1", "/path2", ...]"
-    dbus_array_contents = '", "'.join(settings_paths)
-    dbus_arg = f'%["{dbus_array_contents}"]'
-
-    command = [
-        "dbus",
-        "-y",
-        "com.victronenergy.settings",
-        "/Settings",
-        "RemoveSettings",
-        dbus_arg
-    ]
+    # Build (and validate) the typed array once up front so a retry of the
+    # call does not re-walk the whole path list.
+    paths_array = dbus.Array(settings_paths, signature='s', variant_level=0)
 
     print(f"Attempting to remove the following settings: {settings_paths}")
     try:
-        # Use subprocess.run to execute the command
-        result = subprocess.run(
-            command,
-            check=True,  # Raise an exception if the command fails
-            capture_output=True,
-            text=True
-        )
-        print("Command executed successfully.")
-        print("STDOUT:")
-        print(result.stdout)
-        if result.stderr:
-            print("STDERR:")
-            print(result.stderr)
+        settings_iface = dbus.Interface(_object_proxy('/Settings'), SETTINGS_INTERFACE)
+        result = settings_iface.RemoveSettings(paths_array)
+        print("RemoveSettings call executed successfully.")
+        if result:
+            print(f"Result: {result}")
 
-    except FileNotFoundError:
-        print(f"Error: The 'dbus' command was not found. Please ensure it is installed and in your PATH.", file=sys.stderr)
-    except subprocess.CalledProcessError as e:
-        print(f"Error executing command: {e}", file=sys.stderr)
-        print(f"Return code: {e.returncode}", file=sys.stderr)
-        print(f"STDOUT: {e.stdout}", file=sys.stderr)
-        print(f"STDERR: {e.stderr}", file=sys.stderr)
+    except dbus.exceptions.DBusException as e:
+        print(f"D-Bus error while removing settings: {e}", file=sys.stderr)
     except Exception as e:
         print(f"An unexpected error occurred: {e}", file=sys.stderr)
 
@@ -4,12 +4,58 @@ import requests
 import re
 import shutil
 import zipfile
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # --- Configuration ---
 DRIVER_PATH = "/data/apps"
 GITHUB_USER = "drtinaz"
 TEMP_DIR = "/tmp"
 
+# One session for every GitHub call so TCP/TLS connections are reused
+# instead of re-handshaking per request.
+SESSION = requests.Session()
+SESSION.headers.update({
+    "Accept": "application/vnd.github+json",
+    "User-Agent": "driver-installer",
+})
+
+# Retry transient GitHub/CDN failures with exponential backoff instead of
+# aborting the install on a single 502. respect_retry_after_header makes
+# the session honor the Retry-After that GitHub sends on secondary rate
+# limits; pool_maxsize covers the concurrent batch installs.
+_RETRY = Retry(
+    total=5,
+    status_forcelist=[429, 502, 503, 504],
+    allowed_methods=["GET"],
+    backoff_factor=1.0,
+    respect_retry_after_header=True,
+)
+SESSION.mount("https://", HTTPAdapter(max_retries=_RETRY, pool_maxsize=8))
+
+# An authenticated session gets 5000 req/hr instead of the 60 req/hr
+# unauthenticated cap.
+GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
+if GITHUB_TOKEN:
+    SESSION.headers["Authorization"] = f"Bearer {GITHUB_TOKEN}"
+
+# Tags that count as beta/release-candidate builds
+_BETA_RE = re.compile(r'(?:rc|beta)', re.IGNORECASE)
+
+# Short-lived on-disk cache for /releases responses, so browsing the menu
+# repeatedly doesn't burn through the 60 req/hr unauthenticated rate limit.
+GH_CACHE_DIR = os.path.join(TEMP_DIR, "gh_cache")
+GH_CACHE_TTL = 300  # seconds before revalidating with If-None-Match
+
+# Persistent cache of downloaded zipballs keyed by driver and tag, so
+# reinstalling the same version doesn't redownload it.
+ZIP_CACHE_DIR = "/var/cache/driver_installer"
+
 # Define drivers and their config behavior
 DRIVER_CONFIGS = {
     1: {"name": "auto_current", "config_type": "full_config"}, 
@@ -20,106 +66,180 @@ DRIVER_CONFIGS = {
     6: {"name": "mp2_emulator", "config_type": "full_config"},
 }
 
+# Menu text is static, so render it once at import instead of re-iterating
+# DRIVER_CONFIGS on every prompt retry.
+_DRIVER_MENU = "\n".join(
+    f"{num}) {driver_info['name']}" for num, driver_info in DRIVER_CONFIGS.items()
+) + "\n7) Install/Update ALL drivers (latest stable)\n8) Exit Script"
+
 # --- Helper Functions ---
 
-def get_latest_versions(driver_name):
-    """Fetches the latest stable and beta version tags from GitHub."""
-    api_url = f"https://api.github.com/repos/{GITHUB_USER}/{driver_name}/releases"
+def _write_release_cache(cache_path, entry):
+    """Persists a cache entry; cache failures are never fatal."""
     try:
-        response = requests.get(api_url)
-        response.raise_for_status()
-        releases = response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching version numbers for {driver_name}: {e}")
-        return None, None
+        os.makedirs(GH_CACHE_DIR, exist_ok=True)
+        with open(cache_path, 'w') as f:
+            json.dump(entry, f)
+    except OSError:
+        pass
+
+def _get_zip_cache_path(driver_name, tag):
+    """
+    Returns the cache path for a driver/tag zipball, or None when no
+    writable cache location exists. Falls back to /tmp when /var/cache
+    is read-only.
+    """
+    for base in (ZIP_CACHE_DIR, os.path.join(TEMP_DIR, "driver_installer_cache")):
+        try:
+            os.makedirs(base, exist_ok=True)
+            return os.path.join(base, f"{driver_name}-{tag}.zip")
+        except OSError:
+            continue
+    return None
 
-    stable_tag = None
+def _fetch_releases(driver_name):
+    """
+    Fetches the /releases JSON for a driver, backed by an on-disk cache.
+
+    Fresh entries (younger than GH_CACHE_TTL) are returned without any
+    network traffic; stale entries are revalidated with If-None-Match so
+    an HTTP 304 costs no rate-limit budget for the body.
+    """
+    api_url = f"https://api.github.com/repos/{GITHUB_USER}/{driver_name}/releases"
+    cache_path = os.path.join(GH_CACHE_DIR, f"{driver_name}.json")
+
+    cached = None
     try:
-        latest_release_url = f"https://api.github.com/repos/{GITHUB_USER}/{driver_name}/releases/latest"
-        latest_release = requests.get(latest_release_url).json()
-        stable_tag = latest_release.get("tag_name")
-    except Exception:
+        with open(cache_path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
         pass
 
-    beta_tag = None
+    now = time.time()
+    if cached and now - cached.get("fetched_at", 0) < GH_CACHE_TTL:
+        return cached["body"]
+
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+
+    response = SESSION.get(api_url, headers=headers, timeout=10)
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    if remaining and remaining.isdigit() and int(remaining) < 10:
+        print(f"Warning: only {remaining} GitHub API requests left this hour. "
+              "Set the GITHUB_TOKEN environment variable to raise the limit to 5000/hr.")
+    if response.status_code == 304 and cached:
+        cached["fetched_at"] = now
+        _write_release_cache(cache_path, cached)
+        return cached["body"]
+
+    response.raise_for_status()
+    body = response.json()
+    _write_release_cache(cache_path, {
+        "etag": response.headers.get("ETag"),
+        "fetched_at": now,
+        "body": body,
+    })
+    return body
+
+def get_latest_versions(driver_name):
+    """
+    Fetches the latest stable and beta versions from GitHub.
+
+    A single /releases call carries the tag and zipball URL for every
+    release, so no extra /releases/latest round-trips are needed.
+    Returns (stable_tag, beta_tag, stable_zipball, beta_zipball).
+    """
+    try:
+        releases = _fetch_releases(driver_name)
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching version numbers for {driver_name}: {e}")
+        return None, None, None, None
+
+    stable_tag = stable_zipball = None
+    beta_tag = beta_zipball = None
     for release in releases:
         tag = release.get("tag_name", "")
-        if re.search(r'(rc|beta)', tag, re.IGNORECASE):
+        if not tag or release.get("draft"):
+            continue
+        if not stable_tag and not release.get("prerelease") and not _BETA_RE.search(tag):
+            stable_tag = tag
+            stable_zipball = release.get("zipball_url")
+        elif not beta_tag and _BETA_RE.search(tag):
             beta_tag = tag
+            beta_zipball = release.get("zipball_url")
+        if stable_tag and beta_tag:
             break
-            
-    return stable_tag, beta_tag
+
+    return stable_tag, beta_tag, stable_zipball, beta_zipball
 
 def select_driver():
     """Presents a menu and returns the selected driver name and config type."""
     print("\n--- Driver Selection Menu ---")
+    if not GITHUB_TOKEN:
+        print("(Tip: export GITHUB_TOKEN to avoid GitHub's 60 req/hr rate limit.)")
     while True:
-        for num, driver_info in DRIVER_CONFIGS.items():
-            print(f"{num}) {driver_info['name']}")
-        print("7) Exit Script")
-        
-        choice = input("\nSelect a driver to install (1-6) or 7 to exit: ")
-        
-        if choice == '7':
+        print(_DRIVER_MENU)
+
+        choice = input("\nSelect a driver to install (1-6), 7 for all, or 8 to exit: ")
+
+        if choice == '8':
             print("Exiting script.")
             return None, None
-            
+
+        if choice == '7':
+            return 'ALL', None
+
         try:
             choice_num = int(choice)
             if choice_num in DRIVER_CONFIGS:
                 return DRIVER_CONFIGS[choice_num]['name'], DRIVER_CONFIGS[choice_num]['config_type']
             else:
-                print(f"Invalid option: {choice}. Please enter a number between 1 and 6.")
+                print(f"Invalid option: {choice}. Please enter a number between 1 and 8.")
         except ValueError:
             print("Invalid input. Please enter a number.")
 
-def select_version(driver_name, stable_tag, beta_tag, installed_tag=None):
+def select_version(driver_name, stable_tag, beta_tag, stable_zipball=None, beta_zipball=None, installed_tag=None):
     """
     Presents a version menu and returns the selected tag and download URL.
     - Added installed_tag parameter to display current version.
+    The zipball URLs come from the /releases response already fetched by
+    get_latest_versions, so no further API calls are made here.
     """
     print("\n--- Version Selection ---")
-    
+
     if installed_tag:
         print(f"**Installed version is: {installed_tag}**")
 
     version_options = []
     if stable_tag:
-        version_options.append((f"Latest Stable Release: {stable_tag}", stable_tag))
+        url = stable_zipball or f"https://api.github.com/repos/{GITHUB_USER}/{driver_name}/zipball/{stable_tag}"
+        version_options.append((f"Latest Stable Release: {stable_tag}", stable_tag, url))
     if beta_tag:
-        version_options.append((f"Latest Beta/RC Build: {beta_tag}", beta_tag))
+        url = beta_zipball or f"https://api.github.com/repos/{GITHUB_USER}/{driver_name}/zipball/{beta_tag}"
+        version_options.append((f"Latest Beta/RC Build: {beta_tag}", beta_tag, url))
 
     if not version_options:
         print("Could not fetch any stable or beta version tags. Returning to main menu.")
         return None, None
 
-    version_options.append(("Quit/Cancel Installation", None))
+    version_options.append(("Quit/Cancel Installation", None, None))
 
     while True:
-        for i, (label, tag) in enumerate(version_options, 1):
+        for i, (label, tag, url) in enumerate(version_options, 1):
             print(f"{i}) {label}")
-        
+
         choice = input("\nSelect which version you want to install: ")
-        
+
         try:
             choice_num = int(choice) - 1
             if 0 <= choice_num < len(version_options) - 1:
                 selected_tag = version_options[choice_num][1]
-                
-                if selected_tag == stable_tag:
-                    api_url = f"https://api.github.com/repos/{GITHUB_USER}/{driver_name}/releases/latest"
-                    response = requests.get(api_url).json()
-                    download_url = response.get("zipball_url")
-                else: 
-                    download_url = f"https://api.github.com/repos/{GITHUB_USER}/{driver_name}/zipball/{selected_tag}"
-                    
-                if not download_url:
-                    print(f"Error: Could not determine download URL for tag {selected_tag}. Returning to main menu.")
-                    return None, None
-                    
+                download_url = version_options[choice_num][2]
+
                 print(f"> Selected version: {selected_tag}")
                 return selected_tag, download_url
-                
+
             elif choice_num >= 0 and version_options[choice_num][0] == "Quit/Cancel Installation":
                 print("Installation cancelled. Returning to main menu.")
                 return None, None
@@ -148,25 +268,34 @@ def handle_config_restore(driver_dir, driver_name):
         return True
     return False
 
-def handle_first_run_config(driver_dir, driver_name):
+def handle_first_run_config(driver_dir, driver_name, batch=False):
     """Handles initial config file creation or config.py execution."""
     config_file = os.path.join(driver_dir, "config.ini")
-    
-    if os.path.isfile(config_file):
+
+    # EAFP: one stat syscall instead of an isfile check per candidate file
+    try:
+        os.stat(config_file)
         return
-        
+    except FileNotFoundError:
+        pass
+
     if driver_name in ["auto_current", "gps_socat", "mp2_emulator"]:
         # Create config.ini from config.sample.ini
         sample_file = os.path.join(driver_dir, "config.sample.ini")
-        if os.path.isfile(sample_file):
-            print(f"Creating default config.ini from config.sample.ini for **{driver_name}**...")
+        try:
             shutil.copy2(sample_file, config_file)
-        else:
-             print(f"Warning: No config.ini or config.sample.ini found for {driver_name}.")
+            print(f"Created default config.ini from config.sample.ini for **{driver_name}**.")
+        except FileNotFoundError:
+            print(f"Warning: No config.ini or config.sample.ini found for {driver_name}.")
 
     elif driver_name == "external_devices":
         config_script_path = os.path.join(driver_dir, "config.py")
-        
+
+        if batch:
+            # No prompts in batch mode; leave configuration for the user
+            print(f"[{driver_name}] First install: configuration deferred. Run: python {config_script_path}")
+            return
+
         print("\n" * 2)
         print("=====================================================================")
         print("⚠️ FIRST INSTALLATION DETECTED FOR external_devices ⚠️")
@@ -204,16 +333,25 @@ def handle_first_run_config(driver_dir, driver_name):
 def set_permissions(driver_dir, driver_name):
     """Sets executable permissions for relevant files."""
     print("Setting permissions for files...")
-    
-    executables = [
-        f"{driver_name}.py", "install.sh", "restart.sh", "uninstall.sh", 
-        "config.py", "service/run", "service/log/run",
-    ]
 
-    for file_name in executables:
-        file_path = os.path.join(driver_dir, file_name)
-        if os.path.exists(file_path):
-            os.chmod(file_path, 0o755)
+    # Expected executable basenames per subdirectory. One scandir pass per
+    # directory reuses the DirEntry stat cache instead of issuing a separate
+    # exists() stat for every candidate file.
+    targets = (
+        ("", frozenset({f"{driver_name}.py", "install.sh", "restart.sh", "uninstall.sh", "config.py"})),
+        ("service", frozenset({"run"})),
+        (os.path.join("service", "log"), frozenset({"run"})),
+    )
+
+    for subdir, names in targets:
+        dir_path = os.path.join(driver_dir, subdir) if subdir else driver_dir
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if entry.name in names and entry.is_file(follow_symlinks=False):
+                        os.chmod(entry.path, 0o755)
+        except FileNotFoundError:
+            continue
 
 def prompt_run_script(script_path, script_name, action_desc):
     """Presents the user with a 'Run now or defer' option for a shell script."""
@@ -291,14 +429,28 @@ def handle_config_edit_and_install(driver_dir, driver_name):
             print("Invalid option. Please enter 1 or 2.")
 
 
-def handle_post_install_actions(driver_dir, driver_name, is_update):
+def handle_post_install_actions(driver_dir, driver_name, is_update, batch=False):
     """Handles the final prompts (editing config/running install/restart) based on driver state."""
     print("\n" * 2)
     print(f"--- Final Setup for {driver_name} ---")
-    
+
     install_script = os.path.join(driver_dir, "install.sh")
     restart_script = os.path.join(driver_dir, "restart.sh")
 
+    if batch and not is_update:
+        # First installs need configuration decisions; never prompt in batch
+        # mode, just tell the user what is left to do.
+        print(f"[{driver_name}] First install complete. Finish setup manually:")
+        if driver_name in ["auto_current", "gps_socat", "mp2_emulator"]:
+            print(f"  1. Edit config: nano {os.path.join(driver_dir, 'config.ini')}")
+            print(f"  2. Run install: /bin/bash {install_script}")
+        elif driver_name == "external_devices":
+            print(f"  1. Run config:  python {os.path.join(driver_dir, 'config.py')}")
+            print(f"  2. Run install: /bin/bash {install_script}")
+        else:
+            print(f"  1. Run install: /bin/bash {install_script}")
+        return
+
     if is_update:
         # ALL Updates: Run restart script (non-interactive)
         if os.path.exists(restart_script):
@@ -326,8 +478,13 @@ def handle_post_install_actions(driver_dir, driver_name, is_update):
 
 # --- Installation Function ---
 
-def run_installation(driver_name, config_type):
-    """Handles the full installation/update process for a single driver."""
+def run_installation(driver_name, config_type, batch=False):
+    """
+    Handles the full installation/update process for a single driver.
+
+    In batch mode the latest stable release is installed without any
+    interactive prompts, so several drivers can run concurrently.
+    """
     driver_dir = os.path.join(DRIVER_PATH, driver_name)
     is_update = os.path.isdir(driver_dir)
     installed_tag = None
@@ -343,12 +500,41 @@ def run_installation(driver_name, config_type):
                 print(f"Warning: Could not read existing version file: {e}")
 
     # 1. Fetch Versions and Select Version
-    stable_tag, beta_tag = get_latest_versions(driver_name)
+    stable_tag, beta_tag, stable_zipball, beta_zipball = get_latest_versions(driver_name)
     if not stable_tag and not beta_tag: return
 
-    # Pass the installed_tag to the select_version function
-    selected_tag, download_url = select_version(driver_name, stable_tag, beta_tag, installed_tag=installed_tag)
-    if not selected_tag: return
+    if batch:
+        if not stable_tag:
+            print(f"[{driver_name}] No stable release found. Skipping.")
+            return
+        selected_tag = stable_tag
+        download_url = stable_zipball or f"https://api.github.com/repos/{GITHUB_USER}/{driver_name}/zipball/{stable_tag}"
+        print(f"[{driver_name}] Installing latest stable release: {selected_tag}")
+    else:
+        # Pass the installed_tag to the select_version function
+        selected_tag, download_url = select_version(driver_name, stable_tag, beta_tag,
+                                                    stable_zipball, beta_zipball,
+                                                    installed_tag=installed_tag)
+        if not selected_tag: return
+
+    # Short-circuit when the requested tag is already on disk: the sentinel
+    # is written by this installer after a successful install, so a matching
+    # tag means the whole download/extract/chmod cycle would be a no-op.
+    sentinel_path = os.path.join(driver_dir, ".installed_tag")
+    if is_update:
+        try:
+            with open(sentinel_path) as f:
+                sentinel_tag = f.read().strip()
+        except OSError:
+            sentinel_tag = None
+        if sentinel_tag == selected_tag:
+            if batch:
+                print(f"[{driver_name}] Already at {selected_tag}; skipping.")
+                return
+            answer = input(f"Already at {selected_tag}; reinstall anyway? [y/N]: ").strip().lower()
+            if answer != 'y':
+                print(f"Keeping the existing {selected_tag} installation of {driver_name}.")
+                return
 
     # 2. Pre-transfer Setup
     print(f"\n--- Installation Process for {driver_name} ({selected_tag}) ---")
@@ -359,65 +545,147 @@ def run_installation(driver_name, config_type):
     extract_dir = os.path.join(TEMP_DIR, f"extracted_{driver_name}")
     source_folder = None
     
-    try:
-        print(f"Downloading from: {download_url}")
-        with requests.get(download_url, stream=True) as r:
-            r.raise_for_status()
-            with open(zip_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192): f.write(chunk)
-    except requests.exceptions.RequestException as e:
-        print(f"Download failed. Error: {e}"); return
+    # Download on a worker thread so the disk work of clearing out a stale
+    # extraction directory overlaps with the network transfer.
+    download_error = []
+    cache_path = _get_zip_cache_path(driver_name, selected_tag)
+
+    def _download():
+        try:
+            if cache_path and os.path.isfile(cache_path) and os.path.getsize(cache_path) > 0:
+                # Re-hash the cached zip against the digest recorded when it
+                # was downloaded, so a corrupt cache entry is caught here
+                # instead of as a BadZipFile later.
+                stored_digest = None
+                try:
+                    with open(cache_path + ".sha256") as hf:
+                        stored_digest = hf.read().strip()
+                except OSError:
+                    pass
+                h = hashlib.sha256()
+                with open(cache_path, 'rb') as cf:
+                    for chunk in iter(lambda: cf.read(1024 * 1024), b''):
+                        h.update(chunk)
+                if stored_digest is None or h.hexdigest() == stored_digest:
+                    print(f"Using cached zip for {driver_name} {selected_tag}.")
+                    shutil.copyfile(cache_path, zip_path)
+                    return
+                print(f"Cached zip for {driver_name} {selected_tag} failed its checksum; redownloading.")
+            print(f"Downloading from: {download_url}")
+            h = hashlib.sha256()
+            with SESSION.get(download_url, stream=True, timeout=30) as r:
+                r.raise_for_status()
+                # 1 MiB chunks keep syscall overhead low while the digest is
+                # fed incrementally; SHA256 is effectively free next to the
+                # network and flash I/O.
+                with open(zip_path, 'wb') as f:
+                    for chunk in r.iter_content(chunk_size=1024 * 1024):
+                        h.update(chunk)
+                        f.write(chunk)
+            if cache_path:
+                # Populate the cache atomically, with the digest alongside;
+                # a failed copy only costs a redownload next time.
+                try:
+                    shutil.copyfile(zip_path, cache_path + ".partial")
+                    os.replace(cache_path + ".partial", cache_path)
+                    with open(cache_path + ".sha256", 'w') as hf:
+                        hf.write(h.hexdigest())
+                except OSError:
+                    pass
+        except Exception as e:
+            # Catch everything, not just RequestException: an OSError from
+            # a full disk or a failed cache copy must abort the install
+            # too, or the main thread would unzip whatever stale file is
+            # sitting at zip_path and stamp it with the new tag.
+            download_error.append(e)
+
+    def _cleanup_temp_files():
+        shutil.rmtree(extract_dir, ignore_errors=True)
+        try:
+            os.remove(zip_path)
+        except OSError:
+            pass
 
     try:
-        print("Unzipping driver...")
-        if os.path.exists(extract_dir): shutil.rmtree(extract_dir)
-        os.makedirs(extract_dir)
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_dir)
-            extracted_contents = os.listdir(extract_dir)
-            extracted_folder_name = [d for d in extracted_contents if os.path.isdir(os.path.join(extract_dir, d))][0]
-            source_folder = os.path.join(extract_dir, extracted_folder_name)
-    except Exception as e:
-        print(f"Unzip failed. Error: {e}"); return
-
-    # 3. Config Backup (BEFORE cleaning up the old folder)
-    config_backed_up = False
-    if config_type == 'full_config' and is_update:
-        config_backed_up = handle_config_backup(driver_dir, driver_name)
-
-    # 4. Cleanup Old Driver and Copy New Files
-    print("Cleaning up existing driver installation...")
-    if os.path.isdir(driver_dir):
+        download_thread = threading.Thread(target=_download, daemon=True)
+        download_thread.start()
+
         try:
-            shutil.rmtree(driver_dir)
+            if os.path.exists(extract_dir): shutil.rmtree(extract_dir)
+            os.makedirs(extract_dir)
         except OSError as e:
-            print(f"Error cleaning up old driver files: {e}. Aborting installation."); return
+            download_thread.join()
+            print(f"Could not prepare extraction directory. Error: {e}"); return
+
+        download_thread.join()
+        if download_error:
+            print(f"Download failed. Error: {download_error[0]}"); return
+
+        try:
+            print("Unzipping driver...")
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                # GitHub zipballs wrap everything in a single top-level folder;
+                # read its name from the zip metadata rather than stat-scanning
+                # the extraction directory afterwards.
+                extracted_folder_name = zip_ref.namelist()[0].split('/', 1)[0]
+                zip_ref.extractall(extract_dir)
+                source_folder = os.path.join(extract_dir, extracted_folder_name)
+        except Exception as e:
+            print(f"Unzip failed. Error: {e}"); return
+
+        # 3. Config Backup (BEFORE cleaning up the old folder)
+        config_backed_up = False
+        if config_type == 'full_config' and is_update:
+            config_backed_up = handle_config_backup(driver_dir, driver_name)
+
+        # 4. Cleanup Old Driver and Copy New Files
+        print("Cleaning up existing driver installation...")
+        if os.path.isdir(driver_dir):
+            try:
+                shutil.rmtree(driver_dir)
+            except OSError as e:
+                print(f"Error cleaning up old driver files: {e}. Aborting installation."); return
             
-    print("Copying new driver files...")
-    if source_folder:
-        shutil.move(source_folder, driver_dir)
-    else:
-        print("Error: Could not find extracted source folder. Installation aborted."); return
-
-    # 5. Set Permissions 
-    set_permissions(driver_dir, driver_name)
-
-    # 6. Final Config Steps
-    config_restored = False
-    if config_type == 'full_config':
-        if config_backed_up:
-            config_restored = handle_config_restore(driver_dir, driver_name)
-        if not config_restored and not is_update:
-            # Only run config file creation on first install if not restored
-            handle_first_run_config(driver_dir, driver_name)
-
-    # 7. Final Action (Install/Restart/Prompt)
-    handle_post_install_actions(driver_dir, driver_name, is_update)
+        print("Copying new driver files...")
+        if source_folder:
+            try:
+                # When /tmp and the install target sit on the same
+                # filesystem this is a single rename syscall; otherwise
+                # fall back to shutil.move's copy-and-delete.
+                os.rename(source_folder, driver_dir)
+            except OSError:
+                shutil.move(source_folder, driver_dir)
+        else:
+            print("Error: Could not find extracted source folder. Installation aborted."); return
+
+        # 5. Set Permissions
+        set_permissions(driver_dir, driver_name)
+
+        # Record what was installed so a repeat install of the same tag can
+        # short-circuit the download next time.
+        try:
+            with open(sentinel_path, 'w') as f:
+                f.write(selected_tag)
+        except OSError:
+            pass
+
+        # 6. Final Config Steps
+        config_restored = False
+        if config_type == 'full_config':
+            if config_backed_up:
+                config_restored = handle_config_restore(driver_dir, driver_name)
+            if not config_restored and not is_update:
+                # Only run config file creation on first install if not restored
+                handle_first_run_config(driver_dir, driver_name, batch=batch)
+
+        # 7. Final Action (Install/Restart/Prompt)
+        handle_post_install_actions(driver_dir, driver_name, is_update, batch=batch)
     
-    # 8. Cleanup Temp Files
-    print("\nCleaning up temp files...")
-    if os.path.exists(extract_dir): shutil.rmtree(extract_dir, ignore_errors=True) 
-    if os.path.exists(zip_path): os.remove(zip_path)
+    finally:
+        # Cleanup runs on a daemon thread so the menu returns without
+        # waiting on the rmtree of a freshly extracted tree, and it now
+        # also covers the early-error paths that used to leak /tmp files.
+        threading.Thread(target=_cleanup_temp_files, daemon=True).start()
 
 
 # --- Main Loop ---
@@ -427,10 +695,19 @@ def main():
     
     while True:
         driver_name, config_type = select_driver()
-        
+
         if driver_name is None:
             break
-            
+
+        if driver_name == 'ALL':
+            drivers = [(d['name'], d['config_type']) for d in DRIVER_CONFIGS.values()]
+            print("\nInstalling/updating all drivers to the latest stable release...")
+            # Installs are network/disk bound, so run them concurrently
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(lambda d: run_installation(d[0], d[1], batch=True), drivers))
+            print("\nAll driver installs/updates finished. Returning to main menu.")
+            continue
+
         run_installation(driver_name, config_type)
 
 if __name__ == "__main__":
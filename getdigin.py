@@ -17,137 +17,215 @@ from ve_utils import wrap_dbus_value
 
 
 dbusSystemPath = "com.victronenergy.system"
+BUSITEM_INTERFACE = "com.victronenergy.BusItem"
 
 class TestMonitor:
     def __init__(self):
         self.theBus = dbus.SystemBus()
         self.transferSwitchStateObj = None
         self.transferSwitchActive = False
-        self.currentLimitObj = None
+        self._currentService = None
+        self.acActiveInObj = None
         self.veBusService = "" # Corrected: Consistent casing
-        self.tsInputSearchDelay = 99  # allow search to occur immediately
-        self.custom_transfer_switch_name_found = False # New flag to track if custom name is found
-
-    def updateTransferSwitchState(self):
-        inputValid = False
-        # If transfer switch is currently active, try to get its state
-        if self.transferSwitchActive:
-            try:
-                state = self.transferSwitchStateObj.GetValue()
-                if state == 12 or state == 3:  # 12 and 3 are on generator values
-                    inputValid = True
-                    print("Digital Input State: On Generator (12 or 3)")
-                elif state == 13 or state == 2:  # 13 and 2 are on grid values
-                    inputValid = True
-                    print("Digital Input State: On Grid (13 or 2)")
-                else:
-                    print(f"Digital Input State: Unknown ({state})")
-            except dbus.exceptions.DBusException as e:
-                print(f"DEBUG: DBus Error getting transfer switch state from known object: {e}")
-                pass
+        self.veBusServiceIface = None
+        self._currentLimit = None
+        self._currentLimitMatch = None
+
+        # Discovery is event driven: react to digital input services coming
+        # and going via NameOwnerChanged instead of rescanning the whole bus
+        # on a timer. One full list_names() pass at startup picks up services
+        # that are already on the bus.
+        self.theBus.add_signal_receiver(
+            self._on_name_owner_changed,
+            signal_name="NameOwnerChanged",
+            dbus_interface="org.freedesktop.DBus",
+        )
+        # /VebusService announces changes itself, so the active VE.Bus
+        # service is tracked from its PropertiesChanged signal instead of
+        # being polled; one seeding read happens below.
+        self.theBus.add_signal_receiver(
+            self._on_vebus_service_properties_changed,
+            signal_name="PropertiesChanged",
+            dbus_interface=BUSITEM_INTERFACE,
+            path="/VebusService",
+            bus_name=dbusSystemPath,
+        )
+        for service in self.theBus.list_names():
+            if service.startswith("com.victronenergy.digitalinput"):
+                self._probe_digital_input(service)
+                if self.transferSwitchActive:
+                    break
+        self.getAcInputCurrent()
 
-        # If input is not valid or we need to search for a new one
-        if not inputValid and self.transferSwitchActive:
-            print("Digital input for transfer switch no longer valid. Searching for a new one...")
+    def _on_name_owner_changed(self, name, old_owner, new_owner):
+        """Latches onto transfer switch digital inputs as they appear."""
+        if not name.startswith("com.victronenergy.digitalinput"):
+            return
+        if new_owner and not self.transferSwitchActive:
+            self._probe_digital_input(name)
+        elif old_owner and not new_owner and name == self._currentService:
+            print(f"Transfer switch digital input service {name} left the bus.")
+            self.transferSwitchStateObj = None
             self.transferSwitchActive = False
-            self.custom_transfer_switch_name_found = False
+            self._currentService = None
 
-        # Search for a new digital input service every 10 seconds to avoid unnecessary processing
-        if not inputValid and self.tsInputSearchDelay >= 10:
-            print("DEBUG: Initiating search for digital input service...")
-            newInputService = ""
-            for service in self.theBus.list_names():
-                if service.startswith("com.victronenergy.digitalinput"):
-                    print(f"DEBUG: Found digital input service: {service}")
-                    try:
-                        obj_path = '/CustomName' # Path to the custom name
-                        temp_custom_name_obj = self.theBus.get_object(service, obj_path)
-                        custom_name = temp_custom_name_obj.GetValue()
-                        print(f"DEBUG: Checking CustomName for service {service}: '{custom_name}'")
-
-                        if "transfer switch" in custom_name.lower():
-                            print(f"DEBUG: Found 'transfer switch' in CustomName for service {service}.")
-                            # Now verify it has a '/State' property for actual use
-                            try:
-                                # This just checks if the /State object exists and can be read
-                                self.theBus.get_object(service, '/State').GetValue()
-                                newInputService = service
-                                break
-                            except dbus.exceptions.DBusException as e:
-                                print(f"DEBUG: Service {service} has 'transfer switch' in custom name but no valid '/State' property: {e}")
-                                pass
-
-                    except dbus.exceptions.DBusException as e:
-                        print(f"DEBUG: Service {service} does not have a '/CustomName' property or an error occurred: {e}")
-                        pass
-                else:
-                    print(f"DEBUG: Skipping service (not digitalinput): {service}")
-
-            # Found new service - set up to use its values
-            if newInputService != "":
-                print(f"Discovered transfer switch digital input service at {newInputService} based on custom name.")
-                self.transferSwitchStateObj = self.theBus.get_object(newInputService, '/State')
-                self.transferSwitchActive = True
-                self.custom_transfer_switch_name_found = True
-            elif self.transferSwitchActive: # This case should not be reached if newInputService is "" and transferSwitchActive was True
-                print("Transfer switch digital input service NOT found (no match by custom name).")
-                self.transferSwitchActive = False
-                self.custom_transfer_switch_name_found = False
-
-
-        if self.transferSwitchActive:
-            self.tsInputSearchDelay = 0
+    def _probe_digital_input(self, service):
+        """Checks one digital input service's custom name and caches its /State object on a match."""
+        try:
+            name_obj = self.theBus.get_object(service, '/CustomName', introspect=False)
+            custom_name = dbus.Interface(name_obj, BUSITEM_INTERFACE).GetValue()
+            print(f"DEBUG: Checking CustomName for service {service}: '{custom_name}'")
+            if "transfer switch" not in str(custom_name).lower():
+                return
+            # Verify it has a readable '/State' property for actual use.
+            # Binding the BusItem interface once means later calls skip
+            # dbus-python's per-call method resolution; introspect=False
+            # skips the Introspect round-trip when the proxy is created.
+            state_obj = self.theBus.get_object(service, '/State', introspect=False)
+            state_iface = dbus.Interface(state_obj, BUSITEM_INTERFACE)
+            state_iface.GetValue()
+        except dbus.exceptions.DBusException as e:
+            print(f"DEBUG: Could not use digital input service {service}: {e}")
+            return
+
+        print(f"Discovered transfer switch digital input service at {service} based on custom name.")
+        self.transferSwitchStateObj = state_iface
+        self.transferSwitchActive = True
+        self._currentService = service
+
+    def updateTransferSwitchState(self):
+        if not self.transferSwitchActive:
+            print("Waiting for a transfer switch digital input service to appear...")
+            return
+
+        # Fire the read asynchronously so the mainloop keeps servicing
+        # signals and timers instead of blocking on the round-trip.
+        self.transferSwitchStateObj.GetValue(
+            reply_handler=self._on_transfer_switch_state,
+            error_handler=self._on_transfer_switch_state_error,
+        )
+
+    def _on_transfer_switch_state(self, state):
+        if state == 12 or state == 3:  # 12 and 3 are on generator values
+            print("Digital Input State: On Generator (12 or 3)")
+        elif state == 13 or state == 2:  # 13 and 2 are on grid values
+            print("Digital Input State: On Grid (13 or 2)")
         else:
-            # If search delay timer is active, increment it now
-            if self.tsInputSearchDelay < 10:
-                self.tsInputSearchDelay += 1
-            else:
-                self.tsInputSearchDelay = 0
-            if not self.custom_transfer_switch_name_found:
-                print(f"DEBUG: Still searching for digital input... next search in {10 - self.tsInputSearchDelay} seconds.")
+            print(f"Digital Input State: Unknown ({state})")
+
+    def _on_transfer_switch_state_error(self, e):
+        print(f"DEBUG: DBus Error getting transfer switch state from known object: {e}")
+        print("Digital input for transfer switch no longer valid. Waiting for a new one...")
+        self.transferSwitchStateObj = None
+        self.transferSwitchActive = False
+        self._currentService = None
 
 
     def getAcInputCurrent(self):
-        vebusService = ""
-        try:
-            obj = self.theBus.get_object(dbusSystemPath, '/VebusService')
-            vebusService = obj.GetText()
-        except dbus.exceptions.DBusException as e:
-            if self.veBusService: # Corrected: Consistent casing
-                print(f"DEBUG: Multi/Quattro disappeared - /VebusService invalid: {e}")
-            self.veBusService = "" # Corrected: Consistent casing
-            self.currentLimitObj = None
-            return
+        if self.veBusServiceIface is None:
+            try:
+                obj = self.theBus.get_object(dbusSystemPath, '/VebusService', introspect=False)
+                self.veBusServiceIface = dbus.Interface(obj, BUSITEM_INTERFACE)
+            except dbus.exceptions.DBusException as e:
+                print(f"DEBUG: DBus Error getting /VebusService object: {e}")
+                return
+        self.veBusServiceIface.GetText(
+            reply_handler=self._on_vebus_service,
+            error_handler=self._on_vebus_service_error,
+        )
+
+    def _on_vebus_service_error(self, e):
+        if self.veBusService: # Corrected: Consistent casing
+            print(f"DEBUG: Multi/Quattro disappeared - /VebusService invalid: {e}")
+        self._drop_vebus_service()
+
+    def _on_vebus_service_properties_changed(self, changes):
+        """Handles PropertiesChanged on /VebusService (Value/Text dict)."""
+        self._on_vebus_service(str(changes.get('Text', '---')))
+
+    def _drop_vebus_service(self):
+        self.veBusService = "" # Corrected: Consistent casing
+        self.acActiveInObj = None
+        if self._currentLimitMatch is not None:
+            self._currentLimitMatch.remove()
+            self._currentLimitMatch = None
 
+    def _on_vebus_service(self, vebusService):
         if vebusService == "---":
             if self.veBusService != "": # Corrected: Consistent casing
                 print("DEBUG: Multi/Quattro disappeared (service string is '---')")
-            self.veBusService = "" # Corrected: Consistent casing
-            self.currentLimitObj = None
+            self._drop_vebus_service()
         elif self.veBusService == "" or vebusService != self.veBusService: # Corrected: Consistent casing
+            self._drop_vebus_service()
             self.veBusService = vebusService # Corrected: Consistent casing
             try:
-                self.currentLimitObj = self.theBus.get_object(vebusService, "/Ac/ActiveIn/CurrentLimit")
+                # One proxy for the whole /Ac/ActiveIn subtree: a tree
+                # GetValue on a BusItem branch returns all children in a
+                # single round-trip, instead of one call per item.
+                obj = self.theBus.get_object(vebusService, "/Ac/ActiveIn", introspect=False)
+                self.acActiveInObj = dbus.Interface(obj, BUSITEM_INTERFACE)
+                # After this seed read, current limit updates arrive via
+                # PropertiesChanged rather than polling.
+                self._currentLimitMatch = self.theBus.add_signal_receiver(
+                    self._on_current_limit_changed,
+                    signal_name="PropertiesChanged",
+                    dbus_interface=BUSITEM_INTERFACE,
+                    path="/Ac/ActiveIn/CurrentLimit",
+                    bus_name=vebusService,
+                )
                 print(f"Discovered VE.Bus service at {vebusService}")
             except dbus.exceptions.DBusException as e:
-                print(f"DEBUG: DBus Error setting up current limit object: {e} - cannot get AC input current.")
-                self.currentLimitObj = None
-
-        if self.currentLimitObj:
-            try:
-                current_limit = self.currentLimitObj.GetValue()
-                print(f"Active AC Input Current Limit: {current_limit} A")
-            except dbus.exceptions.DBusException as e:
-                print(f"DEBUG: DBus Error getting AC input current limit: {e}")
+                print(f"DEBUG: DBus Error setting up /Ac/ActiveIn object: {e} - cannot get AC input current.")
+                self._drop_vebus_service()
+
+        if self.acActiveInObj:
+            self.acActiveInObj.GetValue(
+                reply_handler=self._on_ac_active_in,
+                error_handler=self._on_ac_active_in_error,
+            )
         else:
             print("AC Input Current Limit object not available.")
 
+    def _on_ac_active_in(self, ac_active_in):
+        self._set_current_limit(ac_active_in.get('CurrentLimit'))
+
+    def _on_current_limit_changed(self, changes):
+        self._set_current_limit(changes.get('Value'))
 
-    def background(self):
-        print("\n--- Checking Status ---")
+    def _set_current_limit(self, current_limit):
+        # Only report actual changes; signal storms of identical values
+        # stay silent.
+        if current_limit == self._currentLimit:
+            return
+        self._currentLimit = current_limit
+        print(f"Active AC Input Current Limit: {current_limit} A")
+
+    def _on_ac_active_in_error(self, e):
+        print(f"DEBUG: DBus Error getting AC input values: {e}")
+
+
+    def watchdog(self):
+        """
+        Low-frequency sanity check. All real state changes arrive through
+        the NameOwnerChanged and PropertiesChanged handlers; this only
+        verifies the cached proxies still respond, re-scans for a transfer
+        switch input if none is latched, and re-seeds the VE.Bus state if
+        it was lost.
+        """
+        print("\n--- Watchdog ---")
+        if not self.transferSwitchActive:
+            # Recovery scan: renaming an existing input to "transfer
+            # switch" emits no NameOwnerChanged, and a transient probe
+            # failure would otherwise go unrepaired until restart.
+            for service in self.theBus.list_names():
+                if service.startswith("com.victronenergy.digitalinput"):
+                    self._probe_digital_input(service)
+                    if self.transferSwitchActive:
+                        break
         self.updateTransferSwitchState()
-        self.getAcInputCurrent()
-        return True # Keep the GLib.timeout_add running
+        if self.veBusService == "":
+            self.getAcInputCurrent()
+        return True # Keep the GLib timeout running
 
 def main():
     from dbus.mainloop.glib import DBusGMainLoop
@@ -158,8 +236,10 @@ def main():
 
     monitor = TestMonitor()
 
-    # Run the background function every 1 second
-    GLib.timeout_add(1000, monitor.background)
+    # Signals carry all real updates; a 30 s watchdog is enough to notice
+    # a wedged proxy. timeout_add_seconds lets GLib coalesce the wakeup
+    # with other second-resolution timers.
+    GLib.timeout_add_seconds(30, monitor.watchdog)
 
     mainloop = GLib.MainLoop()
     try:
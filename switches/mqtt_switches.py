@@ -4,12 +4,14 @@ from gi.repository import GLib
 import logging
 import sys
 import os
-import random
+import re
 import configparser
-import subprocess
-import time
+import signal
+import select
 import paho.mqtt.client as mqtt
 import threading
+import queue
+from collections import namedtuple
 
 # --- BEGIN: CORRECTED LOGGING SETUP ---
 # Get the root logger instance
@@ -20,23 +22,33 @@ logger = logging.getLogger()
 for handler in logger.handlers[:]:
     logger.removeHandler(handler)
 
-# Now configure the logging for the script
+# Until setup_logging runs with the configured level, records land on a
+# NullHandler: early debug calls are dropped by the level check alone,
+# without being formatted and discarded.
+logger.addHandler(logging.NullHandler())
+logger.setLevel(logging.INFO)
+
 formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
 # Get the directory of the currently running script
 script_dir = os.path.dirname(os.path.abspath(__file__))
 log_file_path = os.path.join(script_dir, 'log')
 
-# Create a FileHandler to write logs to the 'log' file
-file_handler = logging.FileHandler(log_file_path)
-file_handler.setFormatter(formatter)
-
-# Add the FileHandler to the root logger
-logger.addHandler(file_handler)
+_file_handler = None
 
-# Set the root logger's level low enough to catch everything
-# The log level from the config file will filter what is actually written
-logger.setLevel(logging.DEBUG)
+def setup_logging(level):
+    """
+    Attaches the file handler (once) and applies the configured level to
+    both logger and handler, so the level filter runs before any record
+    is formatted.
+    """
+    global _file_handler
+    if _file_handler is None:
+        _file_handler = logging.FileHandler(log_file_path)
+        _file_handler.setFormatter(formatter)
+        logger.addHandler(_file_handler)
+    _file_handler.setLevel(level)
+    logger.setLevel(level)
 # --- END: CORRECTED LOGGING SETUP ---
 
 # A more reliable way to find velib_python
@@ -44,14 +56,60 @@ try:
     sys.path.insert(1, "/opt/victronenergy/dbus-systemcalc-py/ext/velib_python")
     from vedbus import VeDbusService
 except ImportError:
+    setup_logging(logging.INFO)
     logger.critical("Cannot find vedbus library. Please ensure it's in the correct path.")
     sys.exit(1)
 
+# Parsed-config cache: each process reads config.ini once, and settings
+# changes mutate the cached parser in memory before writing it back out,
+# instead of re-parsing the whole file on every D-Bus change.
+_CONFIG_CACHE = {}
+_CONFIG_CACHE_LOCK = threading.Lock()
+
+def load_config(path):
+    """
+    Returns the parsed ConfigParser for a config file, reading it from
+    disk only the first time it is requested in this process.
+    """
+    with _CONFIG_CACHE_LOCK:
+        config = _CONFIG_CACHE.get(path)
+        if config is None:
+            config = configparser.ConfigParser()
+            config.read(path)
+            _CONFIG_CACHE[path] = config
+        return config
+
+# Settings paths look like /SwitchableOutput/output_N/Settings/Key; one
+# precompiled match replaces the split/replace dance per settings write.
+_SETTINGS_RE = re.compile(r'/SwitchableOutput/output_(\d+)/Settings/(\w+)')
+
+# Common prefix of every switchable output path
+_OUTPUT_PREFIX = '/SwitchableOutput/output_'
+
+# Outgoing payloads as ready-made bytes, so publishes don't rebuild them
+_ON = b'ON'
+_OFF = b'OFF'
+
+# Common MQTT state payloads mapped straight from bytes to the new state,
+# so the hot receive path needs no UTF-8 decode, lower() or int() parse.
+_PAYLOAD_MAP = {
+    b'on': 1, b'ON': 1, b'On': 1, b'1': 1, b'true': 1, b'TRUE': 1, b'True': 1,
+    b'off': 0, b'OFF': 0, b'Off': 0, b'0': 0, b'false': 0, b'FALSE': 0, b'False': 0,
+}
+
+# Positional record for one output's settings: attribute access instead
+# of per-field dict hashing, and a fraction of a dict's footprint when
+# NumberOfSwitches is large. The config slices stay plain dicts so they
+# remain JSON-serializable; run_device_service converts them.
+OutputCfg = namedtuple('OutputCfg', 'index name custom_name group state_topic command_topic')
+
 def generate_random_serial(length=16):
     """
-    Generates a random serial number of a given length.
+    Generates a random all-digit serial number of a given length.
     """
-    return ''.join([str(random.randint(0, 9)) for _ in range(length)])
+    # One urandom read and one format instead of a Python-level randint
+    # loop per digit; existing serials stay decimal, so new ones do too.
+    return f"{int.from_bytes(os.urandom(8), 'big') % (10 ** length):0{length}d}"
 
 class DbusMyTestSwitch(VeDbusService):
 
@@ -63,36 +121,51 @@ class DbusMyTestSwitch(VeDbusService):
         # Store device and output config data for saving changes
         self.device_config = device_config
         self.output_configs = output_configs
-        self.device_index = device_config.getint('DeviceIndex')
-        
-        # General device settings
-        self.add_path('/Mgmt/ProcessName', 'dbus-victron-virtual')
-        self.add_path('/Mgmt/ProcessVersion', '0.1.16')
-        self.add_path('/Mgmt/Connection', 'Virtual')
-        
-        # Get values from the device-specific config section
-        self.add_path('/DeviceInstance', self.device_config.getint('DeviceInstance'))
-        self.add_path('/ProductId', 49257)
-        # ProductName is a fixed value and is not writable
-        self.add_path('/ProductName', 'Virtual switch')
-        # Make CustomName writeable and link to the config value
-        self.add_path('/CustomName', self.device_config.get('CustomName'), writeable=True, onchangecallback=self.handle_dbus_change)
-        
-        # Serial number is now read from the config file
-        self.add_path('/Serial', serial_number)
+        self.device_index = device_config['DeviceIndex']
         
-        self.add_path('/State', 256)
-        
-        self.add_path('/FirmwareVersion', 0)
-        self.add_path('/HardwareVersion', 0)
-        self.add_path('/Connected', 1)
+        # General device settings, declared in one batch. ProductName is a
+        # fixed value and is not writable; CustomName is writeable and
+        # linked to the config value; the serial number is read from the
+        # config file.
+        self._add_paths({
+            '/Mgmt/ProcessName': {'initial': 'dbus-victron-virtual'},
+            '/Mgmt/ProcessVersion': {'initial': '0.1.16'},
+            '/Mgmt/Connection': {'initial': 'Virtual'},
+            '/DeviceInstance': {'initial': self.device_config['DeviceInstance']},
+            '/ProductId': {'initial': 49257},
+            '/ProductName': {'initial': 'Virtual switch'},
+            '/CustomName': {'initial': self.device_config.get('CustomName'),
+                            'writeable': True, 'onchangecallback': self._handle_custom_name_change},
+            '/Serial': {'initial': serial_number},
+            '/State': {'initial': 256},
+            '/FirmwareVersion': {'initial': 0},
+            '/HardwareVersion': {'initial': 0},
+            '/Connected': {'initial': 1},
+        })
 
         # MQTT specific members
         self.mqtt_client = None
         self.mqtt_config = mqtt_config
         self.dbus_path_to_state_topic_map = {}
         self.dbus_path_to_command_topic_map = {}
+        # Inverse of the state topic map, so incoming messages resolve
+        # their D-Bus path with one dict lookup instead of a linear scan.
+        self.state_topic_to_dbus_path = {}
         
+        # True while a debounced config flush is scheduled; the dirty
+        # dict records this process's unflushed (section, key) writes.
+        self._config_flush_pending = False
+        self._dirty_settings = {}
+
+        # Pending MQTT-initiated writes keyed by path, applied in one
+        # idle callback; the lock covers access from the network thread.
+        self._pending_updates = {}
+        self._pending_lock = threading.Lock()
+
+        # Bounded queue of outgoing commands, drained by a worker thread
+        self._publish_queue = queue.Queue(maxsize=256)
+        threading.Thread(target=self._publish_worker, daemon=True).start()
+
         # Loop through the outputs and add their D-Bus paths
         for output_data in output_configs:
             self.add_output(output_data)
@@ -105,33 +178,58 @@ class DbusMyTestSwitch(VeDbusService):
         # This is the ONLY message that remains at INFO level
         logger.info(f"Service '{service_name}' for device '{self.device_config.get('CustomName')}' registered on D-Bus.")
 
+    def _add_paths(self, paths):
+        """
+        Registers a batch of paths from one {path: spec} dict, where each
+        spec holds the 'initial' value plus any add_path keyword arguments.
+        velib_python has no true bulk-registration call, so this loops over
+        add_path with the method bound once; registration is still deferred
+        to the single register() at the end of __init__.
+        """
+        add_path = self.add_path
+        for path, spec in paths.items():
+            add_path(path, spec.pop('initial'), **spec)
+
     def add_output(self, output_data):
         """
         Adds a single switchable output and its settings to the D-Bus service,
         and stores MQTT topic mappings.
         """
-        output_prefix = f'/SwitchableOutput/output_{output_data["index"]}'
-        
-        # Store topic mappings for later use
-        state_topic = output_data.get('MqttStateTopic')
-        command_topic = output_data.get('MqttCommandTopic')
-        dbus_state_path = f'{output_prefix}/State'
+        # One interpolation for the base path; everything below is plain
+        # constant-suffix concatenation.
+        base = _OUTPUT_PREFIX + str(output_data.index)
+
+        # Store topic mappings for later use. The topics and paths are a
+        # small fixed set compared against every incoming message and
+        # callback; interning them makes those dict lookups compare by
+        # identity and keeps the string table flat over weeks of uptime.
+        state_topic = output_data.state_topic
+        command_topic = output_data.command_topic
+        if state_topic:
+            state_topic = sys.intern(state_topic)
+        if command_topic:
+            command_topic = sys.intern(command_topic)
+        dbus_state_path = sys.intern(base + '/State')
 
         if state_topic and command_topic:
             self.dbus_path_to_state_topic_map[dbus_state_path] = state_topic
             self.dbus_path_to_command_topic_map[dbus_state_path] = command_topic
-
-        self.add_path(f'{output_prefix}/Name', output_data['name'])
-        self.add_path(f'{output_prefix}/Status', 0)
-
-        # Add the State path, which will be writable.
-        self.add_path(dbus_state_path, 0, writeable=True, onchangecallback=self.handle_dbus_change)
-
-        settings_prefix = f'{output_prefix}/Settings'
-        self.add_path(f'{settings_prefix}/CustomName', output_data['custom_name'], writeable=True, onchangecallback=self.handle_dbus_change)
-        self.add_path(f'{settings_prefix}/Group', output_data['group'], writeable=True, onchangecallback=self.handle_dbus_change)
-        self.add_path(f'{settings_prefix}/Type', 1, writeable=True)
-        self.add_path(f'{settings_prefix}/ValidTypes', 7)
+            self.state_topic_to_dbus_path[state_topic] = dbus_state_path
+
+        settings_cb = self._handle_settings_change
+        self._add_paths({
+            base + '/Name': {'initial': output_data.name},
+            base + '/Status': {'initial': 0},
+            # The State path is writable
+            dbus_state_path: {'initial': 0, 'writeable': True,
+                              'onchangecallback': self._handle_state_change},
+            base + '/Settings/CustomName': {'initial': output_data.custom_name,
+                                            'writeable': True, 'onchangecallback': settings_cb},
+            base + '/Settings/Group': {'initial': output_data.group,
+                                       'writeable': True, 'onchangecallback': settings_cb},
+            base + '/Settings/Type': {'initial': 1, 'writeable': True},
+            base + '/Settings/ValidTypes': {'initial': 7},
+        })
 
     def setup_mqtt_client(self):
         """
@@ -156,7 +254,7 @@ class DbusMyTestSwitch(VeDbusService):
         try:
             self.mqtt_client.connect(
                 self.mqtt_config.get('BrokerAddress'),
-                self.mqtt_config.getint('Port', 1883),
+                int(self.mqtt_config.get('Port', 1883)),
                 60
             )
             # Start the MQTT network loop in a separate thread
@@ -172,11 +270,12 @@ class DbusMyTestSwitch(VeDbusService):
         """
         if rc == 0:
             logger.debug("Connected to MQTT Broker!")
-            # Subscribe ONLY to state topics
-            state_topics = list(self.dbus_path_to_state_topic_map.values())
-            for topic in state_topics:
-                client.subscribe(topic)
-                logger.debug(f"Subscribed to MQTT state topic: {topic}")
+            # Subscribe ONLY to state topics, all in one SUBSCRIBE packet
+            # instead of one broker round-trip per topic.
+            topics = [(topic, 0) for topic in self.dbus_path_to_state_topic_map.values()]
+            if topics:
+                client.subscribe(topics)
+                logger.debug(f"Subscribed to MQTT state topics: {[t for t, _ in topics]}")
         else:
             logger.error(f"Failed to connect to MQTT broker, return code {rc}")
 
@@ -186,34 +285,44 @@ class DbusMyTestSwitch(VeDbusService):
         Handles both 'on'/'off' and '0'/'1' payloads.
         """
         try:
-            payload = msg.payload.decode().strip().lower()
             topic = msg.topic
-            logger.debug(f"Received MQTT message on topic '{topic}': {payload}")
-
-            # Determine the new state based on the payload string
-            if payload == 'on':
-                new_state = 1
-            elif payload == 'off':
-                new_state = 0
-            else:
-                try:
-                    new_state = int(payload)
-                except ValueError:
-                    logger.warning(f"Invalid MQTT payload received: {payload}. Expected 'on', 'off', '0', or '1'.")
-                    return
+            logger.debug("Received MQTT message on topic '%s': %s", topic, msg.payload)
+
+            # Fast path: map the raw bytes straight to a state
+            new_state = _PAYLOAD_MAP.get(msg.payload.strip())
+            if new_state is None:
+                # Slow path for unusual casing or other numeric payloads:
+                # lower and retry the map, then isdigit() screens out junk
+                # up front instead of paying for a raised-and-caught
+                # ValueError on every bad payload.
+                payload = msg.payload.decode().strip().lower()
+                new_state = _PAYLOAD_MAP.get(payload.encode())
+                if new_state is None:
+                    if payload.isdigit():
+                        new_state = int(payload)
+                    else:
+                        logger.warning(f"Invalid MQTT payload received: {payload}. Expected 'on', 'off', '0', or '1'.")
+                        return
             
             # Find the corresponding D-Bus path for this topic
-            dbus_path = next((k for k, v in self.dbus_path_to_state_topic_map.items() if v == topic), None)
+            dbus_path = self.state_topic_to_dbus_path.get(topic)
             
             if dbus_path:
                 # Check if the state is already the same to prevent redundant D-Bus signals.
                 if self[dbus_path] == new_state:
-                    logger.debug(f"D-Bus state is already {new_state}, ignoring redundant MQTT message.")
+                    logger.debug("D-Bus state is already %s, ignoring redundant MQTT message.", new_state)
                     return
                 
-                # Use GLib.idle_add to schedule the D-Bus update in the main thread
-                # This will trigger a PropertiesChanged signal on D-Bus.
-                GLib.idle_add(self.update_dbus_from_mqtt, dbus_path, new_state)
+                # Queue the write and schedule one idle callback for the
+                # whole batch: a storm of messages costs a single main
+                # loop dispatch, and repeats for one path collapse to the
+                # last value. The flush triggers PropertiesChanged on
+                # D-Bus from the main thread.
+                with self._pending_lock:
+                    schedule = not self._pending_updates
+                    self._pending_updates[dbus_path] = new_state
+                if schedule:
+                    GLib.idle_add(self._flush_pending_updates)
             
         except (ValueError, KeyError) as e:
             logger.error(f"Error processing MQTT message: {e}")
@@ -222,71 +331,111 @@ class DbusMyTestSwitch(VeDbusService):
         """
         MQTT callback for when a publish request has been sent.
         """
-        logger.debug(f"Publish message with mid: {mid} acknowledged by client.")
+        logger.debug("Publish message with mid: %s acknowledged by client.", mid)
 
-    def handle_dbus_change(self, path, value):
+    def _handle_state_change(self, path, value):
         """
-        Callback function to handle changes to D-Bus paths.
-        This is triggered when a D-Bus client requests a change.
+        Change callback for output /State paths: publishes the command to
+        MQTT. Registered per path, so no path inspection is needed here.
         """
-        # If the change is to a state path, publish to MQTT
-        if "/State" in path:
-            logger.debug(f"D-Bus change handler triggered for {path} with value {value}")
-            if value not in [0, 1]:
-                logger.warning(f"Invalid D-Bus state value received: {value}. Expected 0 or 1.")
-                return False
-            self.publish_mqtt_command(path, value)
-            return True
-        
-        # If the change is to the top-level device's CustomName, save it to the config file
-        elif path == '/CustomName':
-            key_name = 'CustomName'
-            section_name = f'Device_{self.device_index}'
-            logger.debug(f"D-Bus settings change triggered for {path} with value '{value}'. Saving to config file.")
-            self.save_config_change(section_name, key_name, value)
-            return True
-
-        # If the change is to a nested settings path, save it to the config file
-        elif "/Settings" in path:
+        logger.debug("D-Bus change handler triggered for %s with value %s", path, value)
+        if value != 0 and value != 1:
+            logger.warning("Invalid D-Bus state value received: %s. Expected 0 or 1.", value)
+            return False
+        self.publish_mqtt_command(path, value)
+        # Mirror the new state to the state topic as a retained
+        # message, so the broker replays last-known state on the next
+        # (re)connect and no startup state poll is ever needed.
+        state_topic = self.dbus_path_to_state_topic_map.get(path)
+        if state_topic:
             try:
-                parts = path.split('/')
-                # Corrected indices below
-                output_index = parts[2].replace('output_', '')
-                setting_key = parts[4]
-                section_name = f'Output_{self.device_index}_{output_index}'
-                logger.debug(f"D-Bus settings change triggered for {path} with value '{value}'. Saving to config file.")
-                self.save_config_change(section_name, setting_key, value)
-                return True
-            except IndexError:
-                logger.error(f"Could not parse D-Bus path for config save: {path}")
-                return False
-
-        logger.warning(f"Unhandled D-Bus change request for path: {path}")
-        return False
+                self._publish_queue.put_nowait((state_topic, _ON if value == 1 else _OFF, True))
+            except queue.Full:
+                logger.error("Publish queue full; dropping retained state for '%s'", path)
+        return True
+
+    def _handle_custom_name_change(self, path, value):
+        """Change callback for the device-level /CustomName path."""
+        logger.debug("D-Bus settings change triggered for %s with value '%s'. Saving to config file.", path, value)
+        self.save_config_change(f'Device_{self.device_index}', 'CustomName', value)
+        return True
+
+    def _handle_settings_change(self, path, value):
+        """
+        Change callback for per-output /Settings/* paths: saves the value
+        to the corresponding section of the config file.
+        """
+        m = _SETTINGS_RE.match(path)
+        if m is None:
+            logger.error("Could not parse D-Bus path for config save: %s", path)
+            return False
+        output_index, setting_key = m.group(1), m.group(2)
+        section_name = f'Output_{self.device_index}_{output_index}'
+        logger.debug("D-Bus settings change triggered for %s with value '%s'. Saving to config file.", path, value)
+        self.save_config_change(section_name, setting_key, value)
+        return True
 
     def save_config_change(self, section, key, value):
         """
         Saves a changed D-Bus setting to the corresponding config file.
         """
         config_file_path = os.path.join(os.path.dirname(__file__), 'config.ini')
-        config = configparser.ConfigParser()
-        
+
         try:
-            config.read(config_file_path)
-            
-            if not config.has_section(section):
-                logger.warning(f"Creating new section '{section}' in config file.")
-                config.add_section(section)
+            config = load_config(config_file_path)
 
-            # Update the value and write to file
-            config.set(section, key, str(value))
-            with open(config_file_path, 'w') as configfile:
-                config.write(configfile)
-                
-            logger.debug(f"Successfully saved setting '{key}' to section '{section}' in config file.")
+            # Mutate the cached parser so in-process reads see the new
+            # value, and record the dirty pair for the flush; the actual
+            # disk write is debounced so bursts (e.g. per-keystroke
+            # CustomName edits from the GUI) coalesce into a single flush.
+            with _CONFIG_CACHE_LOCK:
+                if not config.has_section(section):
+                    logger.warning(f"Creating new section '{section}' in config file.")
+                    config.add_section(section)
+
+                config.set(section, key, str(value))
+                self._dirty_settings[(section, key)] = str(value)
+
+            if not self._config_flush_pending:
+                self._config_flush_pending = True
+                GLib.timeout_add(500, self._flush_config, config_file_path)
+
+            logger.debug("Queued setting '%s' in section '%s' for config flush.", key, section)
 
         except Exception as e:
             logger.error(f"Failed to save config file changes for key '{key}' in section '{section}': {e}")
+
+    def _flush_config(self, config_file_path):
+        """
+        Writes this process's pending settings to disk. config.ini is
+        re-read into a fresh parser and only the dirty (section, key)
+        pairs are applied on top before the write: each device runs in
+        its own forked process, so serializing this process's cached
+        parser wholesale would revert sections another device process
+        flushed since startup. The temp-file-and-rename keeps a kill
+        mid-write from ever leaving a truncated config.ini.
+        """
+        self._config_flush_pending = False
+        tmp_path = config_file_path + '.tmp'
+        try:
+            config = configparser.ConfigParser()
+            config.read(config_file_path)
+            with _CONFIG_CACHE_LOCK:
+                for (section, key), value in self._dirty_settings.items():
+                    if not config.has_section(section):
+                        config.add_section(section)
+                    config.set(section, key, value)
+                self._dirty_settings = {}
+                # The merged parser becomes the new cache, so in-process
+                # reads also converge on the other processes' changes.
+                _CONFIG_CACHE[config_file_path] = config
+                with open(tmp_path, 'w') as configfile:
+                    config.write(configfile)
+                os.replace(tmp_path, config_file_path)
+            logger.debug("Config file changes flushed to disk.")
+        except Exception as e:
+            logger.error(f"Failed to flush config file changes: {e}")
+        return False # one-shot timer
             
     def publish_mqtt_command(self, path, value):
         """
@@ -297,88 +446,100 @@ class DbusMyTestSwitch(VeDbusService):
             return
 
         if path not in self.dbus_path_to_command_topic_map:
-            logger.warning(f"No command topic mapped for D-Bus path: {path}")
+            logger.warning("No command topic mapped for D-Bus path: %s", path)
             return
 
+        command_topic = self.dbus_path_to_command_topic_map[path]
+        mqtt_payload = _ON if value == 1 else _OFF
         try:
-            command_topic = self.dbus_path_to_command_topic_map[path]
-            mqtt_payload = 'ON' if value == 1 else 'OFF'
-            # Note: Commands are typically not retained
-            (rc, mid) = self.mqtt_client.publish(command_topic, mqtt_payload, retain=False)
-            
-            if rc == mqtt.MQTT_ERR_SUCCESS:
-                logger.debug(f"Publish request for '{path}' sent to command topic '{command_topic}'. mid: {mid}")
-            else:
-                logger.error(f"Failed to publish to '{command_topic}', return code: {rc}")
-        except Exception as e:
-            logger.error(f"Error during MQTT publish: {e}")
-            
+            # Note: Commands are typically not retained. Enqueue and return
+            # immediately; the worker thread does the actual publish.
+            self._publish_queue.put_nowait((command_topic, mqtt_payload, False))
+        except queue.Full:
+            logger.error("Publish queue full; dropping command for '%s'", path)
+
+    def _publish_worker(self):
+        """
+        Drains the publish queue on a dedicated thread, so D-Bus change
+        callbacks never block on paho's socket lock.
+        """
+        while True:
+            command_topic, mqtt_payload, retain = self._publish_queue.get()
+            try:
+                (rc, mid) = self.mqtt_client.publish(command_topic, mqtt_payload, 0, retain)
+
+                if rc == mqtt.MQTT_ERR_SUCCESS:
+                    logger.debug("Publish request sent to command topic '%s'. mid: %s", command_topic, mid)
+                else:
+                    logger.error(f"Failed to publish to '{command_topic}', return code: {rc}")
+            except Exception as e:
+                logger.error(f"Error during MQTT publish: {e}")
+
+    def _flush_pending_updates(self):
+        """
+        Applies every queued MQTT-initiated write in one main-loop
+        dispatch instead of one idle wakeup per message.
+        """
+        with self._pending_lock:
+            pending = self._pending_updates
+            self._pending_updates = {}
+        for path, value in pending.items():
+            self.update_dbus_from_mqtt(path, value)
+        return False
+
     def update_dbus_from_mqtt(self, path, value):
         """
         A centralized method to handle MQTT-initiated state changes to D-Bus.
         """
+        # Re-check equality here: on_mqtt_message already filters, but
+        # another message can land between its check and this idle
+        # callback running, and an unconditional write would emit a
+        # redundant PropertiesChanged signal.
+        if self[path] == value:
+            return False
         self[path] = value
-        logger.debug(f"Successfully changed '{path}' to {value} from source: mqtt")
-        
-        return False # Return False for GLib.idle_add to run only once
+        logger.debug("Successfully changed '%s' to %s from source: mqtt", path, value)
 
-def run_device_service(device_index):
-    """
-    Main function for a single D-Bus service process.
-    """
-    from dbus.mainloop.glib import DBusGMainLoop
-    DBusGMainLoop(set_as_default=True)
-    
-    # Log the start of this specific device process
-    logger.info(f"Starting D-Bus service process for device {device_index}.")
+        return False # Return False for GLib.idle_add to run only once
 
-    config_file_path = os.path.join(os.path.dirname(__file__), 'config.ini')
-    config = configparser.ConfigParser()
-    if not os.path.exists(config_file_path):
-        logger.critical(f"Configuration file not found: {config_file_path}")
-        sys.exit(1)
-    
-    try:
-        config.read(config_file_path)
-    except configparser.Error as e:
-        logger.critical(f"Error parsing configuration file: {e}")
-        sys.exit(1)
-        
-    # Mapping for log levels
-    LOG_LEVELS = {
-        'DEBUG': logging.DEBUG,
-        'INFO': logging.INFO,
-        'WARNING': logging.WARNING,
-        'ERROR': logging.ERROR,
-        'CRITICAL': logging.CRITICAL
-    }
-    
-    # Get log level from config, default to INFO if not found or invalid
+# Mapping for log levels
+LOG_LEVELS = {
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARNING': logging.WARNING,
+    'ERROR': logging.ERROR,
+    'CRITICAL': logging.CRITICAL
+}
+
+def _log_level_from_config(config):
+    """Reads [Global] LogLevel, defaulting to INFO if missing or invalid."""
     if config.has_section('Global'):
         log_level_str = config['Global'].get('LogLevel', 'INFO').upper()
-        log_level = LOG_LEVELS.get(log_level_str, logging.INFO)
-    else:
-        log_level = logging.INFO
-        
-    logger.setLevel(log_level)
-    logger.debug(f"Log level set to: {logging.getLevelName(logger.level)}")
+        return LOG_LEVELS.get(log_level_str, logging.INFO)
+    return logging.INFO
+
+def _build_device_cfg(config, device_index, config_file_path):
+    """
+    Extracts one device's slice of the parsed config as a plain dict, the
+    form run_device_service consumes. Generates and persists a missing
+    serial number. Returns None when the device section does not exist.
+    """
+    # Section names are case-sensitive, so one frozenset lookup per name
+    # replaces configparser's has_section scan in the loops below.
+    sections = frozenset(config.sections())
 
     device_section = f'Device_{device_index}'
-    if not config.has_section(device_section):
-        logger.critical(f"Configuration section '{device_section}' not found. Cannot start.")
-        sys.exit(1)
-        
-    device_config = config[device_section]
-    
-    # Store the device index in the device config for later use
-    device_config['DeviceIndex'] = str(device_index)
-    
+    if device_section not in sections:
+        return None
+
+    section = config[device_section]
+
     # Check for an existing serial number, or generate a new one
-    serial_number = device_config.get('Serial')
+    serial_number = section.get('Serial')
     if not serial_number or serial_number.strip() == '':
         serial_number = generate_random_serial()
         logger.debug(f"Generated new serial number '{serial_number}' for device {device_index}. Saving to config file.")
-        
+
         # Update the in-memory config object and write it back to the file
         config.set(device_section, 'Serial', serial_number)
         try:
@@ -386,20 +547,22 @@ def run_device_service(device_index):
                 config.write(configfile)
         except Exception as e:
             logger.error(f"Failed to save serial number to config file: {e}")
-            
+
     else:
         logger.debug(f"Using existing serial number '{serial_number}' for device {device_index}.")
 
     try:
-        num_switches = device_config.getint('NumberOfSwitches')
+        num_switches = section.getint('NumberOfSwitches')
     except (configparser.NoOptionError, ValueError):
+        num_switches = None
+    if not num_switches:
         logger.warning("No 'NumberOfSwitches' found in [Global] section. Defaulting to 1 switch.")
         num_switches = 1
 
-    output_configs = []
+    outputs = []
     for j in range(1, num_switches + 1):
         output_section = f'Output_{device_index}_{j}'
-        
+
         output_data = {
             'index': j,
             'name': f'Switch {j}',
@@ -409,102 +572,248 @@ def run_device_service(device_index):
             'MqttCommandTopic': None,
         }
 
-        if config.has_section(output_section):
+        if output_section in sections:
             output_settings = config[output_section]
             output_data['custom_name'] = output_settings.get('CustomName', '')
             output_data['group'] = output_settings.get('Group', '')
             output_data['MqttStateTopic'] = output_settings.get('MqttStateTopic', None)
             output_data['MqttCommandTopic'] = output_settings.get('MqttCommandTopic', None)
-        
-        output_configs.append(output_data)
 
+        outputs.append(output_data)
+
+    return {
+        'DeviceIndex': int(device_index),
+        'DeviceInstance': section.getint('DeviceInstance'),
+        'CustomName': section.get('CustomName'),
+        'Serial': serial_number,
+        'outputs': outputs,
+        'mqtt': dict(config['MQTT']) if 'MQTT' in sections else {},
+    }
+
+def run_device_service(device_index, device_cfg=None):
+    """
+    Main function for a single D-Bus service process.
+
+    device_cfg is the pre-parsed slice built by _build_device_cfg in the
+    launcher, passed straight through the fork so the child never parses
+    config.ini itself. When the script is started directly with just a
+    device index, the config is parsed here as before.
+    """
+    from dbus.mainloop.glib import DBusGMainLoop
+    DBusGMainLoop(set_as_default=True)
+
+    config_file_path = os.path.join(os.path.dirname(__file__), 'config.ini')
+
+    if device_cfg is None:
+        # Direct invocation: parse the config ourselves.
+        if not os.path.exists(config_file_path):
+            setup_logging(logging.INFO)
+            logger.critical(f"Configuration file not found: {config_file_path}")
+            sys.exit(1)
+
+        try:
+            config = load_config(config_file_path)
+        except configparser.Error as e:
+            setup_logging(logging.INFO)
+            logger.critical(f"Error parsing configuration file: {e}")
+            sys.exit(1)
+
+        device_cfg = _build_device_cfg(config, device_index, config_file_path)
+        if device_cfg is None:
+            setup_logging(logging.INFO)
+            logger.critical(f"Configuration section 'Device_{device_index}' not found. Cannot start.")
+            sys.exit(1)
+        device_cfg['LogLevel'] = _log_level_from_config(config)
+
+    setup_logging(device_cfg.get('LogLevel', logging.INFO))
+    logger.debug(f"Log level set to: {logging.getLevelName(logger.level)}")
+
+    # Log the start of this specific device process
+    logger.info(f"Starting D-Bus service process for device {device_index}.")
+
+    serial_number = device_cfg['Serial']
     service_name = f'com.victronenergy.switch.virtual_{serial_number}'
 
-    # Get MQTT configuration
-    mqtt_config = config['MQTT'] if config.has_section('MQTT') else {}
+    output_configs = [
+        OutputCfg(o['index'], o['name'], o['custom_name'], o['group'],
+                  o.get('MqttStateTopic'), o.get('MqttCommandTopic'))
+        for o in device_cfg['outputs']
+    ]
 
     # Pass the MQTT config to the DbusMyTestSwitch class
-    DbusMyTestSwitch(service_name, device_config, output_configs, serial_number, mqtt_config)
-    
+    DbusMyTestSwitch(service_name, device_cfg, output_configs, serial_number, device_cfg['mqtt'])
+
     logger.debug('Connected to D-Bus, and switching over to GLib.MainLoop() (= event based)')
-    
+
     mainloop = GLib.MainLoop()
     mainloop.run()
 
+# os.waitstatus_to_exitcode only exists on Python 3.9+; older builds get
+# the classic WIFEXITED/WTERMSIG dance (negative value = killed by signal,
+# matching the 3.9 semantics).
+_waitstatus_to_exitcode = getattr(os, 'waitstatus_to_exitcode', None)
+if _waitstatus_to_exitcode is None:
+    def _waitstatus_to_exitcode(status):
+        if os.WIFEXITED(status):
+            return os.WEXITSTATUS(status)
+        return -os.WTERMSIG(status)
+
+def _pidfd_supported():
+    """
+    Checks that pidfd_open actually works here. hasattr only proves the
+    Python build is 3.9+; on a pre-5.3 kernel (still common on GX
+    hardware) the syscall itself fails with ENOSYS, so probe it for real.
+    """
+    if not hasattr(os, 'pidfd_open'):
+        return False
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except OSError:
+        return False
+    return True
+
 def main():
     """
     The main launcher function that runs as the parent process.
     """
-    # Log the start of the overall launcher script
-    logger.info("Starting D-Bus Virtual Switch service launcher.")
-
     config_file_path = os.path.join(os.path.dirname(__file__), 'config.ini')
-    config = configparser.ConfigParser()
     if not os.path.exists(config_file_path):
+        setup_logging(logging.INFO)
         logger.critical(f"Configuration file not found: {config_file_path}")
         sys.exit(1)
-    
+
     try:
-        config.read(config_file_path)
+        config = load_config(config_file_path)
     except configparser.Error as e:
+        setup_logging(logging.INFO)
         logger.critical(f"Error parsing configuration file: {e}")
         sys.exit(1)
     
-    # Mapping for log levels
-    LOG_LEVELS = {
-        'DEBUG': logging.DEBUG,
-        'INFO': logging.INFO,
-        'WARNING': logging.WARNING,
-        'ERROR': logging.ERROR,
-        'CRITICAL': logging.CRITICAL
-    }
-    
-    # Get log level from config, default to INFO if not found or invalid
-    if config.has_section('Global'):
-        log_level_str = config['Global'].get('LogLevel', 'INFO').upper()
-        log_level = LOG_LEVELS.get(log_level_str, logging.INFO)
-    else:
-        log_level = logging.INFO
-    
-    logger.setLevel(log_level)
+    log_level = _log_level_from_config(config)
+    setup_logging(log_level)
     logger.debug(f"Log level set to: {logging.getLevelName(logger.level)}")
 
+    # Log the start of the overall launcher script
+    logger.info("Starting D-Bus Virtual Switch service launcher.")
+
     try:
         num_devices = config.getint('Global', 'NumberOfDevices')
     except (configparser.NoSectionError, configparser.NoOptionError):
         logger.warning("No 'NumberOfDevices' found in [Global] section. Defaulting to 1 device.")
         num_devices = 1
 
-    script_path = os.path.abspath(sys.argv[0])
-    processes = []
-    
+    pids = []
+
+    use_pidfd = _pidfd_supported()
+    wait_signals = {signal.SIGCHLD, signal.SIGINT, signal.SIGTERM}
+    if not use_pidfd:
+        # Block the supervised signals before forking so none can be
+        # delivered between spawn and the sigwait below; the children
+        # unblock them again right after the fork.
+        signal.pthread_sigmask(signal.SIG_BLOCK, wait_signals)
+
     logger.debug(f"Starting {num_devices} virtual switch device processes...")
 
     for i in range(1, num_devices + 1):
-        device_section = f'Device_{i}'
-        
-        if not config.has_section(device_section):
-            logger.warning(f"Configuration section '{device_section}' not found. Skipping device {i}.")
+        # Parse each device's slice once here and hand it straight to the
+        # forked child, so the children never run configparser at all.
+        device_cfg = _build_device_cfg(config, i, config_file_path)
+        if device_cfg is None:
+            logger.warning(f"Configuration section 'Device_{i}' not found. Skipping device {i}.")
             continue
-            
-        cmd = [sys.executable, script_path, str(i)]
-        
+        device_cfg['LogLevel'] = log_level
+
+        # Fork instead of spawning a fresh interpreter: the children
+        # inherit the already-imported gi/dbus/paho/vedbus modules and
+        # skip interpreter startup plus the import cost entirely.
         try:
-            process = subprocess.Popen(cmd, env=os.environ, close_fds=True)
-            processes.append(process)
-            logger.debug(f"Started process for virtual device {i} (PID: {process.pid})")
-        except Exception as e:
+            pid = os.fork()
+        except OSError as e:
             logger.error(f"Failed to start process for device {i}: {e}")
+            continue
+
+        if pid == 0:
+            try:
+                if not use_pidfd:
+                    signal.pthread_sigmask(signal.SIG_UNBLOCK, wait_signals)
+                run_device_service(i, device_cfg)
+            except Exception:
+                logger.exception(f"Device process {i} crashed.")
+                os._exit(1)
+            os._exit(0)
+
+        pids.append(pid)
+        logger.debug(f"Started process for virtual device {i} (PID: {pid})")
             
+    def _wait_pidfd():
+        """
+        Blocks in poll() on one pidfd per child until all have exited.
+        The parent sleeps in the kernel the whole time and observes each
+        child death immediately.
+        """
+        poller = select.poll()
+        pidfds = {}
+        try:
+            for pid in pids:
+                fd = os.pidfd_open(pid)
+                pidfds[fd] = pid
+                poller.register(fd, select.POLLIN)
+            while pidfds:
+                for fd, _event in poller.poll():
+                    pid = pidfds.pop(fd)
+                    poller.unregister(fd)
+                    os.close(fd)
+                    _, status = os.waitpid(pid, 0)
+                    logger.warning(f"Device process PID {pid} exited with code {_waitstatus_to_exitcode(status)}.")
+        finally:
+            for fd in pidfds:
+                os.close(fd)
+
+    def _wait_sigwait():
+        """
+        Fallback for kernels without pidfd_open (pre-5.3): sleep in
+        sigwait until a child dies or a termination signal arrives, so
+        the idle parent never wakes at all.
+        """
+        remaining = set(pids)
+        while remaining:
+            sig = signal.sigwait(wait_signals)
+            if sig != signal.SIGCHLD:
+                raise KeyboardInterrupt
+            # Reap whichever children have died.
+            while remaining:
+                try:
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    remaining.clear()
+                    break
+                if pid == 0:
+                    break
+                remaining.discard(pid)
+                logger.warning(f"Device process PID {pid} exited with code {_waitstatus_to_exitcode(status)}.")
+
     try:
-        while True:
-            time.sleep(1)
+        if use_pidfd:
+            _wait_pidfd()
+        else:
+            _wait_sigwait()
     except KeyboardInterrupt:
-        logger.debug("Terminating all child processes.")
-        for p in processes:
-            p.terminate()
-        for p in processes:
-            p.wait()
+        pass
+
+    logger.debug("Terminating all child processes.")
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    # Reap in whatever order the children actually exit, so shutdown
+    # takes as long as the slowest child rather than the sum of all of
+    # them; ECHILD means everything has been collected.
+    while True:
+        try:
+            os.waitpid(-1, 0)
+        except ChildProcessError:
+            break
 
 if __name__ == "__main__":
     if len(sys.argv) > 1: